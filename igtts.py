@@ -1,16 +1,30 @@
 ﻿"""Gemini TTS 工具集 helper utilities."""
 from __future__ import annotations
 
+import functools
 import json
 import logging
+import os
+import queue
+import stat
+import struct
+import tempfile
+import threading
 import time
-import wave
+from concurrent.futures import CancelledError
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
-import requests
-from google import genai
-from google.genai import types
+if TYPE_CHECKING:  # pragma: no cover - heavy imports deferred until first use
+    import requests
+    from google import genai
+    from google.genai import types
+
+try:  # pragma: no cover - optional accelerator
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 __all__ = [
     "__version__",
@@ -23,13 +37,16 @@ __all__ = [
     "fetch_available_voices",
     "translate_voice_label",
     "create_client",
+    "close_shared_sessions",
     "gemini_tts",
+    "gemini_tts_batch",
     "save_as_wav_file",
 ]
 
 __version__ = "1.4.5"
 
 CONFIG_FILENAME = "config.json"
+VOICE_CACHE_FILENAME = "voices.cache.json"
 
 
 def _config_path() -> Path:
@@ -37,37 +54,54 @@ def _config_path() -> Path:
     return Path.cwd() / CONFIG_FILENAME
 
 
+def _voice_cache_path() -> Path:
+    """Return the path to the voice list sidecar cache."""
+    return Path.cwd() / VOICE_CACHE_FILENAME
+
+
 CONFIG_PATH = _config_path()
 MODEL_KEY = "model"
 DEFAULT_MODEL = "gemini-2.5-pro-preview-tts"
 DEFAULT_LOG_FILE = "log.log"
 VOICE_ENDPOINT = "https://texttospeech.googleapis.com/v1/voices"
 VOICE_CACHE_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_BATCH_PARALLELISM = 4
 
 WAV_CHANNELS = 1
 WAV_RATE = 24_000
 WAV_SAMPLE_WIDTH = 2
+WAV_HEADER_FORMAT = "<4sI4s4sIHHIIHH4sI"
+
+_CONFIG_CACHE: Optional[Tuple[Tuple[Any, ...], Dict[str, Any]]] = None
+_CONFIG_CACHE_LOCK = threading.Lock()
+_LOG_SIGNATURE: Optional[Tuple[bool, str]] = None
 
 LOGGER = logging.getLogger("igtts")
 LOGGER.addHandler(logging.NullHandler())
+_LOG_FORMATTER = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+
+KNOWN_CONFIG_KEYS = frozenset(
+    {
+        "api_key",
+        "base_url",
+        MODEL_KEY,
+        "default_voice",
+        "default_output",
+        "input_text_path",
+        "voices",
+        "voices_cached_at",
+        "debug_enabled",
+        "log_file",
+        "batch_tasks_path",
+        "multi_delay_seconds",
+        "batch_parallelism",
+        "quiet_mode",
+        "version",
+    }
+)
 
-KNOWN_CONFIG_KEYS = {
-    "api_key",
-    "base_url",
-    MODEL_KEY,
-    "default_voice",
-    "default_output",
-    "input_text_path",
-    "voices",
-    "voices_cached_at",
-    "debug_enabled",
-    "log_file",
-    "batch_tasks_path",
-    "multi_delay_seconds",
-    "version",
-}
-
-_DEFAULT_VOICE_DATA: List[Dict[str, str]] = [
+# Shared by every default voice list; treat the entries as read-only.
+_DEFAULT_VOICE_DATA: Tuple[Dict[str, str], ...] = (
     {"id": "Zephyr", "label": "Zephyr (明亮)"},
     {"id": "Puck", "label": "Puck (欢快)"},
     {"id": "Charon", "label": "Charon (信息丰富)"},
@@ -98,31 +132,41 @@ _DEFAULT_VOICE_DATA: List[Dict[str, str]] = [
     {"id": "Sadachbia", "label": "Sadachbia (活泼)"},
     {"id": "Sadaltager", "label": "Sadaltager (博学)"},
     {"id": "Sulafat", "label": "Sulafat (温暖)"},
-]
+)
 
 
 def _default_voice_list() -> List[Dict[str, str]]:
-    """Return a fresh copy of the built-in voice list."""
-    return [voice.copy() for voice in _DEFAULT_VOICE_DATA]
+    """Return a fresh list over the shared built-in voice entries."""
+    return list(_DEFAULT_VOICE_DATA)
 
 
-def _clone_default_config() -> Dict[str, Any]:
-    """Return a mutable clone of the default configuration."""
-    return {
+# Scalar defaults shared by every clone; "voices" is filled in per copy.
+_DEFAULT_CONFIG_TEMPLATE: Mapping[str, Any] = MappingProxyType(
+    {
         "api_key": "",
         "base_url": "https://generativelanguage.googleapis.com",
         MODEL_KEY: DEFAULT_MODEL,
         "default_voice": "Zephyr",
         "default_output": "output.wav",
         "input_text_path": "input.txt",
-        "voices": _default_voice_list(),
+        "voices": None,
         "voices_cached_at": None,
         "debug_enabled": False,
         "log_file": DEFAULT_LOG_FILE,
         "batch_tasks_path": "",
         "multi_delay_seconds": 0.0,
+        "batch_parallelism": DEFAULT_BATCH_PARALLELISM,
+        "quiet_mode": False,
         "version": __version__,
     }
+)
+
+
+def _clone_default_config() -> Dict[str, Any]:
+    """Return a mutable clone of the default configuration."""
+    config = dict(_DEFAULT_CONFIG_TEMPLATE)
+    config["voices"] = _default_voice_list()
+    return config
 
 
 DEFAULT_VOICES: List[Dict[str, str]] = _default_voice_list()
@@ -131,6 +175,11 @@ DEFAULT_CONFIG: Dict[str, Any] = _clone_default_config()
 
 def configure_logging(config: Dict[str, Any]) -> None:
     """Set up logging destinations according to configuration."""
+    global _LOG_SIGNATURE
+    signature = (bool(config.get("debug_enabled")), str(config.get("log_file") or ""))
+    if signature == _LOG_SIGNATURE:
+        return
+
     level = logging.DEBUG if config.get("debug_enabled") else logging.INFO
     LOGGER.setLevel(level)
     LOGGER.propagate = False
@@ -141,7 +190,7 @@ def configure_logging(config: Dict[str, Any]) -> None:
     )
     if console_handler is None:
         console_handler = logging.StreamHandler()
-        console_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+        console_handler.setFormatter(_LOG_FORMATTER)
         LOGGER.addHandler(console_handler)
     console_handler.setLevel(logging.DEBUG if config.get("debug_enabled") else logging.WARNING)
 
@@ -160,51 +209,207 @@ def configure_logging(config: Dict[str, Any]) -> None:
             file_handler = logging.FileHandler(log_path, encoding="utf-8")
         except OSError as exc:
             LOGGER.warning("Unable to open log file %s: %s", log_path, exc)
+            return
         else:
-            file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+            file_handler.setFormatter(_LOG_FORMATTER)
             file_handler.setLevel(logging.DEBUG)
             LOGGER.addHandler(file_handler)
 
+    _LOG_SIGNATURE = signature
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decode JSON bytes, preferring orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode *obj* as indented UTF-8 JSON, preferring orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
 
 def load_config() -> Dict[str, Any]:
-    """Read configuration from disk, creating defaults when absent."""
+    """Read configuration from disk, creating defaults when absent.
+
+    Cache hits return a shallow copy; the ``voices`` list is shared with the
+    cache, so replace it instead of mutating it in place.
+    """
+    global _CONFIG_CACHE
     path = _config_path()
     globals()["CONFIG_PATH"] = path
 
-    if not path.exists():
-        defaults = _clone_default_config()
+    try:
+        st = path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        defaults = _NormalizedConfig(_clone_default_config())
         save_config(defaults)
         return defaults
 
+    signature = (
+        str(path),
+        st.st_mtime_ns,
+        st.st_size,
+        st.st_ino,
+        _stat_signature(_voice_cache_path()),
+    )
+    with _CONFIG_CACHE_LOCK:
+        cached = _CONFIG_CACHE
+    if cached is not None and cached[0] == signature:
+        return _NormalizedConfig(cached[1])
+
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
+        data = _json_loads(path.read_bytes())
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError):
         LOGGER.warning("Configuration file corrupted, restoring defaults.")
-        defaults = _clone_default_config()
+        defaults = _NormalizedConfig(_clone_default_config())
         save_config(defaults)
         return defaults
 
-    return _ensure_config_schema(data)
+    if isinstance(data, dict):
+        _merge_voice_cache(data)
+
+    config = _ensure_config_schema(data)
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE = (signature, config)
+    return _NormalizedConfig(config)
+
+
+@functools.lru_cache(maxsize=1)
+def _new_file_mode() -> int:
+    """Return the mode open() gives new files under the process umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write *data* to a temporary sibling and atomically swap it into *path*."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        # mkstemp creates 0600 files; keep the mode the target already had.
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = _new_file_mode()
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
 
 
 def save_config(config: Dict[str, Any]) -> None:
     """Persist configuration to disk."""
+    global _CONFIG_CACHE
     path = _config_path()
     globals()["CONFIG_PATH"] = path
 
     try:
-        path.write_text(json.dumps(config, indent=2, ensure_ascii=False), encoding="utf-8")
+        _atomic_write_bytes(path, _json_dumps(config))
     except OSError as exc:
         LOGGER.warning("Failed to write configuration: %s", exc)
+    finally:
+        with _CONFIG_CACHE_LOCK:
+            _CONFIG_CACHE = None
+
+
+def _stat_signature(path: Path) -> Optional[Tuple[int, int, int]]:
+    """Return (mtime_ns, size, inode) for *path*, or None when it is missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _merge_voice_cache(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Overlay the voice sidecar onto *data* when its cache is newer."""
+    try:
+        cache = _json_loads(_voice_cache_path().read_bytes())
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+        return data
+    if not isinstance(cache, dict):
+        return data
+
+    cache_time = cache.get("voices_cached_at")
+    current_time = data.get("voices_cached_at")
+    if not isinstance(cache_time, (int, float)):
+        return data
+    if isinstance(current_time, (int, float)) and current_time >= cache_time:
+        return data
+
+    data["voices"] = cache.get("voices")
+    data["voices_cached_at"] = cache_time
+    return data
+
+
+def _save_voice_cache(voices: List[Dict[str, str]], cached_at: Optional[float]) -> None:
+    """Persist only the voice list and its timestamp to the sidecar cache."""
+    path = _voice_cache_path()
+    try:
+        _atomic_write_bytes(path, _json_dumps({"voices": voices, "voices_cached_at": cached_at}))
+    except OSError as exc:
+        LOGGER.warning("Failed to write voice cache: %s", exc)
+
+
+class _NormalizedConfig(dict):
+    """Config dict produced by _ensure_config_schema; any mutation drops the tag."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.normalized = True
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.normalized = False
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self.normalized = False
+        super().__delitem__(key)
+
+    def __ior__(self, other: Any) -> "_NormalizedConfig":
+        self.normalized = False
+        return super().__ior__(other)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self.normalized = False
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        self.normalized = False
+        return super().setdefault(key, default)
+
+    def pop(self, *args: Any) -> Any:
+        self.normalized = False
+        return super().pop(*args)
+
+    def popitem(self) -> Tuple[str, Any]:
+        self.normalized = False
+        return super().popitem()
+
+    def clear(self) -> None:
+        self.normalized = False
+        super().clear()
 
 
 def _ensure_config_schema(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """Merge defaults and remove unknown keys."""
-    merged: Dict[str, Any] = _clone_default_config()
+    if isinstance(config, _NormalizedConfig) and config.normalized:
+        return config
+
+    # "voices" is always rebuilt below, so skip cloning the default list here.
+    merged: Dict[str, Any] = dict(_DEFAULT_CONFIG_TEMPLATE)
     if config:
-        for key, value in config.items():
-            if key in KNOWN_CONFIG_KEYS:
-                merged[key] = value
+        merged.update({key: value for key, value in config.items() if key in KNOWN_CONFIG_KEYS})
 
     voices = merged.get("voices") or []
     if not isinstance(voices, list) or not voices:
@@ -212,12 +417,15 @@ def _ensure_config_schema(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     else:
         normalized: List[Dict[str, str]] = []
         for item in voices:
-            if not isinstance(item, dict):
+            try:
+                voice_id = item["id"]
+                label = item.get("label", "")
+            except (TypeError, KeyError, AttributeError):
                 continue
-            voice_id = str(item.get("id", "")).strip()
+            voice_id = (voice_id if isinstance(voice_id, str) else str(voice_id)).strip()
             if not voice_id:
                 continue
-            label = str(item.get("label", "")).strip() or voice_id
+            label = (label if isinstance(label, str) else str(label)).strip() or voice_id
             normalized.append({"id": voice_id, "label": label})
         voices = normalized or _default_voice_list()
     merged["voices"] = voices
@@ -234,9 +442,32 @@ def _ensure_config_schema(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     except (TypeError, ValueError):
         merged["multi_delay_seconds"] = 0.0
 
+    try:
+        merged["batch_parallelism"] = max(1, int(merged.get("batch_parallelism", DEFAULT_BATCH_PARALLELISM)))
+    except (TypeError, ValueError):
+        merged["batch_parallelism"] = DEFAULT_BATCH_PARALLELISM
+
     merged["version"] = __version__
 
-    return merged
+    return _NormalizedConfig(merged)
+
+
+def _voice_cache_is_fresh(config: Dict[str, Any]) -> bool:
+    """Return True when *config* holds voices cached within the TTL."""
+    cached_at = config.get("voices_cached_at")
+    return bool(
+        config.get("voices")
+        and cached_at
+        and (time.time() - float(cached_at)) < VOICE_CACHE_TTL_SECONDS
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _get_http_session() -> requests.Session:
+    """Return the shared keep-alive session used for voice list requests."""
+    import requests
+
+    return requests.Session()
 
 
 def fetch_available_voices(
@@ -245,17 +476,18 @@ def fetch_available_voices(
     force_refresh: bool = False,
 ) -> List[Dict[str, str]]:
     """Retrieve available voices from Gemini API or fall back to defaults."""
-    config = _ensure_config_schema(config or load_config())
+    if not config:
+        config = load_config()
+    else:
+        config = _ensure_config_schema(config)
+        if not force_refresh and _voice_cache_is_fresh(config):
+            return config["voices"]
+        # A refresh writes only the sidecar, so the caller's copy may predate it.
+        config = _ensure_config_schema(_merge_voice_cache(dict(config)))
     cached_voices = config.get("voices") or []
-    cached_at = config.get("voices_cached_at")
     default_voices = _default_voice_list()
 
-    if (
-        cached_voices
-        and cached_at
-        and not force_refresh
-        and (time.time() - float(cached_at)) < VOICE_CACHE_TTL_SECONDS
-    ):
+    if not force_refresh and _voice_cache_is_fresh(config):
         return cached_voices
 
     api_key = str(config.get("api_key", "")).strip()
@@ -263,11 +495,13 @@ def fetch_available_voices(
         if not cached_voices:
             config["voices"] = default_voices
             config["voices_cached_at"] = time.time()
-            save_config(config)
+            _save_voice_cache(config["voices"], config["voices_cached_at"])
         return cached_voices or default_voices
 
+    import requests
+
     try:
-        response = requests.get(VOICE_ENDPOINT, params={"key": api_key}, timeout=30)
+        response = _get_http_session().get(VOICE_ENDPOINT, params={"key": api_key}, timeout=30)
         response.raise_for_status()
         payload = response.json()
     except requests.RequestException as exc:
@@ -275,29 +509,32 @@ def fetch_available_voices(
         if not cached_voices:
             config["voices"] = default_voices
             config["voices_cached_at"] = time.time()
-            save_config(config)
+            _save_voice_cache(config["voices"], config["voices_cached_at"])
         return cached_voices or default_voices
     except json.JSONDecodeError as exc:
         LOGGER.warning("Voice list response invalid JSON: %s", exc)
         if not cached_voices:
             config["voices"] = default_voices
             config["voices_cached_at"] = time.time()
-            save_config(config)
+            _save_voice_cache(config["voices"], config["voices_cached_at"])
         return cached_voices or default_voices
 
     voices: List[Dict[str, str]] = []
+    append_voice = voices.append
+    label_for = translate_voice_label
     for item in payload.get("voices", []):
         if not isinstance(item, dict):
             continue
         name = item.get("name")
         if not name:
             continue
-        description = item.get("description")
-        language_codes = item.get("languageCodes") if isinstance(item.get("languageCodes"), list) else None
-        voices.append(
+        language_codes = item.get("languageCodes")
+        if not isinstance(language_codes, list):
+            language_codes = None
+        append_voice(
             {
                 "id": name,
-                "label": translate_voice_label(name, description, language_codes=language_codes),
+                "label": label_for(name, item.get("description"), language_codes=language_codes),
             }
         )
 
@@ -307,7 +544,7 @@ def fetch_available_voices(
 
     config["voices"] = voices
     config["voices_cached_at"] = time.time()
-    save_config(config)
+    _save_voice_cache(config["voices"], config["voices_cached_at"])
 
     return voices
 
@@ -319,12 +556,11 @@ def translate_voice_label(
     language_codes: Optional[List[str]] = None,
 ) -> str:
     """Generate a human-friendly label for a voice."""
-    detail_parts: List[str] = []
-    if description:
-        detail_parts.append(description)
-    if language_codes:
-        detail_parts.extend(language_codes)
-    detail_text = ", ".join(part for part in detail_parts if part).strip()
+    codes_text = ", ".join(code for code in language_codes if code) if language_codes else ""
+    if description and codes_text:
+        detail_text = f"{description}, {codes_text}".strip()
+    else:
+        detail_text = (description or codes_text).strip()
     if detail_text and detail_text.lower() not in voice_id.lower():
         return f"{voice_id} ({detail_text})"
     return voice_id
@@ -337,10 +573,29 @@ def create_client(config: Dict[str, Any]) -> genai.Client:
         raise ValueError("Gemini API key missing. Please configure it first.")
 
     base_url = str(config.get("base_url", "")).strip()
+    return _get_client(api_key, base_url)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str, base_url: str) -> genai.Client:
+    """Return a shared Gemini client for the given credentials."""
+    # Reused across calls and worker threads; google-genai clients are safe for
+    # concurrent requests and keep their HTTP connection pool warm this way.
+    from google import genai
+    from google.genai import types
+
     http_options = types.HttpOptions(base_url=base_url) if base_url else None
     return genai.Client(api_key=api_key, http_options=http_options)
 
 
+def close_shared_sessions() -> None:
+    """Close the shared HTTP session and drop cached Gemini clients."""
+    if _get_http_session.cache_info().currsize:
+        _get_http_session().close()
+    _get_http_session.cache_clear()
+    _get_client.cache_clear()
+
+
 def gemini_tts(
     text: str,
     voice: str,
@@ -355,6 +610,83 @@ def gemini_tts(
 
     target_config = _ensure_config_schema(config or load_config())
     client = create_client(target_config)
+    return _synthesize(client, target_config, text, voice, output_path, speed)
+
+
+def gemini_tts_batch(
+    tasks: Sequence[Tuple[str, str, str]],
+    *,
+    max_workers: Optional[int] = None,
+    speed: float = 1.0,
+    config: Optional[Dict[str, Any]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    on_result: Optional[Callable[[int, Optional[Exception]], None]] = None,
+) -> List[Optional[Exception]]:
+    """Synthesize (text, voice, output_path) *tasks* concurrently; None marks success.
+
+    Tasks still queued when *cancel_event* is set are skipped and reported as
+    CancelledError. *on_result* is called from a worker thread with the task
+    index and error after each finished task; without it failures are logged.
+    Workers are daemon threads, so exiting never waits on in-flight requests.
+    """
+    if not tasks:
+        return []
+    target_config = _ensure_config_schema(config or load_config())
+    client = create_client(target_config)
+    delay = max(0.0, float(target_config.get("multi_delay_seconds") or 0.0))
+    if max_workers is None:
+        max_workers = int(target_config.get("batch_parallelism") or DEFAULT_BATCH_PARALLELISM)
+    cancel = cancel_event or threading.Event()
+    results: List[Optional[Exception]] = [CancelledError() for _ in tasks]
+    pending: "queue.Queue[Optional[int]]" = queue.Queue()
+
+    def run() -> None:
+        while True:
+            index = pending.get()
+            if index is None:
+                return
+            if cancel.is_set():
+                continue
+            text, voice, output_path = tasks[index]
+            error: Optional[Exception] = None
+            try:
+                if not text or not text.strip():
+                    raise ValueError("Input text is empty.")
+                _synthesize(client, target_config, text, voice, output_path, speed)
+            except Exception as exc:
+                error = exc
+            results[index] = error
+            if on_result is not None:
+                on_result(index, error)
+            elif error is not None:
+                LOGGER.error("Batch task for %s failed: %s", output_path, error)
+
+    workers = [threading.Thread(target=run, daemon=True) for _ in range(min(max(1, max_workers), len(tasks)))]
+    for worker in workers:
+        worker.start()
+    for index in range(len(tasks)):
+        # Waiting on the event keeps multi_delay_seconds as submit spacing and
+        # lets a cancel cut it short.
+        if cancel.wait(delay if index else 0):
+            break
+        pending.put(index)
+    for _ in workers:
+        pending.put(None)
+    for worker in workers:
+        worker.join()
+    return results
+
+
+def _synthesize(
+    client: genai.Client,
+    target_config: Dict[str, Any],
+    text: str,
+    voice: str,
+    output_path: str,
+    speed: float,
+) -> bool:
+    """Run one synthesis request on *client* and write the WAV file."""
+    from google.genai import types
 
     speech_config = types.SpeechConfig(
         voice_config=types.VoiceConfig(
@@ -383,16 +715,21 @@ def gemini_tts(
 
 def _extract_pcm_data(response: types.GenerateContentResponse) -> Optional[bytes]:
     """Extract inline PCM payload from response."""
-    if not response or not getattr(response, "candidates", None):
+    try:
+        candidate = response.candidates[0]
+    except (AttributeError, IndexError, TypeError):
         LOGGER.error("Gemini response is empty.")
         return None
 
-    candidate = response.candidates[0]
-    parts = getattr(candidate.content, "parts", []) if candidate and candidate.content else []
+    try:
+        parts = candidate.content.parts or ()
+    except AttributeError:
+        parts = ()
     for part in parts:
-        inline_data = getattr(part, "inline_data", None)
-        if inline_data and getattr(inline_data, "data", None):
-            return inline_data.data
+        inline_data = part.inline_data
+        data = inline_data.data if inline_data else None
+        if data:
+            return data
 
     LOGGER.error("No PCM payload found in Gemini response.")
     return None
@@ -408,21 +745,48 @@ def _calculate_sample_rate(speed: float) -> int:
     return int(WAV_RATE * value)
 
 
+def _wav_header(data_size: int, sample_rate: int) -> bytes:
+    """Build the 44-byte PCM WAV header for *data_size* bytes of audio."""
+    block_align = WAV_CHANNELS * WAV_SAMPLE_WIDTH
+    return struct.pack(
+        WAV_HEADER_FORMAT,
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        WAV_CHANNELS,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        WAV_SAMPLE_WIDTH * 8,
+        b"data",
+        data_size,
+    )
+
+
 def save_as_wav_file(filename: str, pcm_data: bytes, sample_rate: int = WAV_RATE) -> None:
     """Persist PCM bytes to WAV file."""
     target = Path(filename)
     target.parent.mkdir(parents=True, exist_ok=True)
+    header = _wav_header(len(pcm_data), sample_rate)
 
-    wav_file: Optional[wave.Wave_write] = None
+    if not hasattr(os, "writev"):  # pragma: no cover - Windows
+        with open(target, "wb") as handle:
+            handle.write(header)
+            handle.write(pcm_data)
+        return
+
+    fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
     try:
-        wav_file = wave.open(str(target), "wb")
-        wav_file.setnchannels(WAV_CHANNELS)
-        wav_file.setsampwidth(WAV_SAMPLE_WIDTH)
-        wav_file.setframerate(sample_rate)
-        wav_file.writeframes(pcm_data)
+        buffers = [memoryview(header), memoryview(pcm_data).cast("B")]
+        while buffers:
+            written = os.writev(fd, buffers)
+            while buffers and written >= len(buffers[0]):
+                written -= len(buffers[0])
+                buffers.pop(0)
+            if buffers and written:
+                buffers[0] = buffers[0][written:]
     finally:
-        if wav_file is not None:
-            try:
-                wav_file.close()
-            except Exception as exc:  # pragma: no cover
-                LOGGER.warning("Failed to close WAV handle for %s: %s", target, exc)
+        os.close(fd)
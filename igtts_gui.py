@@ -1,25 +1,31 @@
 ﻿"""Gemini TTS 工具集 Tkinter 图形界面。"""
 from __future__ import annotations
 
+import contextlib
+import functools
 import logging
 import queue
+import re
 import threading
 import time
 import tkinter as tk
+from concurrent.futures import CancelledError
 from dataclasses import dataclass
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
 from tkinter.scrolledtext import ScrolledText
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from igtts import (
     __version__,
     MODEL_KEY,
     DEFAULT_CONFIG,
     DEFAULT_VOICES,
+    close_shared_sessions,
     configure_logging,
     fetch_available_voices,
     gemini_tts,
+    gemini_tts_batch,
     load_config,
     save_config,
 )
@@ -28,78 +34,101 @@ SINGLE_TEXT_HEIGHT = 8
 BATCH_ROW_TEXT_HEIGHT = 4
 LOG_TEXT_HEIGHT = 6
 MAX_LOG_LINES = 500
+LOG_FLUSH_BATCH = 256
+LOG_FLUSH_INTERVAL_MS = 100
+CONFIG_FLUSH_DELAY_MS = 1000
+EXPORT_BUFFER_SIZE = 1 << 20
 VOICE_LABEL = "音色 / ID"
 STATUS_READY = "已准备完毕。"
 BATCH_FILENAME_TEMPLATE = "{stem}_{index:03d}{suffix}"
 GUI_LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
 DEFAULT_BATCH_ROWS = 3
+BATCH_POOL_SIZE = 12
+BATCH_ROW_SPACING = 8
+BATCH_VIEWPORT_HEIGHT = 320
+BATCH_RESIZE_THROTTLE_MS = 30
 BATCH_HINT = (
     "每个条目可独立填写文本、音色 ID 与输出路径；未填写输出时将按照默认输出自动追加序号。"
 )
 
 
+_ESCAPE_TABLE = str.maketrans({"\n": "\\n", "\\": "\\\\", "|": "\\|"})
+_ESCAPE_SEQUENCE_RE = re.compile(r"\\(.)", re.DOTALL)
+_ESCAPED_FIELD_RE = re.compile(r"((?:\\.|[^\\|])*\\?)(\||\Z)", re.DOTALL)
+
+
 def _escape_field(value: str) -> str:
     """将字段内容编码为批量文件格式。"""
-    buffer: List[str] = []
-    for ch in value:
-        if ch == "\n":
-            buffer.append("\\n")
-        elif ch == "\\":
-            buffer.append("\\\\")
-        elif ch == "|":
-            buffer.append("\\|")
-        else:
-            buffer.append(ch)
-    return "".join(buffer)
+    if "\\" not in value and "|" not in value and "\n" not in value:
+        return value
+    return value.translate(_ESCAPE_TABLE)
+
+
+def _unescape_char(match: "re.Match[str]") -> str:
+    """还原单个转义序列。"""
+    char = match.group(1)
+    return "\n" if char == "n" else char
 
 
 def _unescape_field(value: str) -> str:
     """还原批量文件中的转义字段。"""
-    buffer: List[str] = []
-    i = 0
-    length = len(value)
-    while i < length:
-        ch = value[i]
-        if ch == "\\" and i + 1 < length:
-            nxt = value[i + 1]
-            if nxt == "n":
-                buffer.append("\n")
-            elif nxt in {"|", "\\"}:
-                buffer.append(nxt)
-            else:
-                buffer.append(nxt)
-            i += 2
-            continue
-        buffer.append(ch)
-        i += 1
-    return "".join(buffer)
+    if "\\" not in value:
+        return value
+    return _ESCAPE_SEQUENCE_RE.sub(_unescape_char, value)
 
 
 def _split_escaped_line(line: str) -> List[str]:
     """在保留转义的前提下按竖线拆分。"""
+    if "\\" not in line:
+        return line.split("|")
     fields: List[str] = []
-    current: List[str] = []
-    escape = False
-    for ch in line:
-        if escape:
-            current.append(ch)
-            escape = False
-            continue
-        if ch == "\\":
-            current.append(ch)
-            escape = True
-            continue
-        if ch == "|":
-            fields.append("".join(current))
-            current = []
-            continue
-        current.append(ch)
-    fields.append("".join(current))
+    for match in _ESCAPED_FIELD_RE.finditer(line):
+        fields.append(match.group(1))
+        if not match.group(2):
+            break
     return fields
 
+
+def _format_task_row(text: str, voice: str, output: str) -> str:
+    """将单条任务编码为批量文件中的一行（含换行符）。"""
+    parts = [_escape_field(text)]
+    if voice:
+        parts.append(_escape_field(voice))
+    if output:
+        parts.append(_escape_field(output))
+    return " | ".join(parts) + "\n"
+
+
+def _iter_task_rows(path: str) -> Iterator[Tuple[str, str, str]]:
+    """逐行读取批量文件，产出 (文本, 音色, 输出)。"""
+    with open(path, encoding="utf-8") as handle:
+        for chunk in handle:
+            # 与 str.splitlines 保持一致，兼容 \x85、\u2028 等行分隔符。
+            for line in chunk.splitlines():
+                stripped = line.strip()
+                if not stripped or stripped.startswith("#"):
+                    continue
+                parts = [_unescape_field(part).strip() for part in _split_escaped_line(stripped)[:3]]
+                parts.extend(("",) * (3 - len(parts)))
+                text, voice, output = parts
+                if text or voice or output:
+                    yield text, voice, output
+
+
+@functools.lru_cache(maxsize=32)
+def _resolve_parent_dir(path_str: str) -> str:
+    """解析文件对话框的初始目录，结果按路径字符串缓存；绝对路径无需 resolve。"""
+    path = Path(path_str)
+    if path.is_absolute():
+        return str(path.parent)
+    try:
+        return str(path.resolve().parent)
+    except Exception:
+        return str(Path.cwd())
+
 @dataclass
 class BatchRow:
-    """批量模式中单个任务的控件集合。"""
+    """批量视口中可复用的一组条目控件，data_index 指向当前绑定的数据。"""
 
     frame: ttk.Frame
     index_label: ttk.Label
@@ -110,6 +139,10 @@ class BatchRow:
     output_entry: ttk.Entry
     browse_button: ttk.Button
     remove_button: ttk.Button
+    data_index: int = -1
+    text_dirty: bool = False
+    last_index: int = 0
+    last_remove_state: str = ""
 
 
 class GuiLogHandler(logging.Handler):
@@ -139,39 +172,59 @@ class GeminiTTSApp:
 
         self.config = load_config()
         configure_logging(self.config)
+        self._default_output = ""
+        self._default_voice = ""
+        self._input_text_path = ""
+        self._sync_config_cache()
 
+        self._init_state()
+        self._build_ui()
+        self._setup_logging()
+        self._ensure_initial_batch_rows()
+
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.root.after(0, self._finish_boot)
+
+    def _init_state(self) -> None:
+        """初始化音色索引、Tk 变量与运行状态。"""
         self.voices: List[Dict[str, str]] = self.config.get("voices", []) or DEFAULT_VOICES
-        self.voice_map: Dict[str, str] = {
-            (item.get("label") or item.get("id", "")): item.get("id", "")
-            for item in self.voices
-            if item.get("label") or item.get("id")
-        }
+        self.voice_map: Dict[str, str] = {}
+        self._voice_id_to_label: Dict[str, str] = {}
+        self._sorted_labels: List[str] = []
+        self._rebuild_voice_indices()
 
         self.status_var = tk.StringVar(value=STATUS_READY)
         self.voice_var = tk.StringVar()
         self.manual_voice_var = tk.StringVar(value=str(self.config.get("default_voice", "")))
-        self.output_path_var = tk.StringVar(
-            value=str(self.config.get("default_output", DEFAULT_CONFIG["default_output"]))
-        )
+        self.output_path_var = tk.StringVar(value=self._default_output)
         self.multi_delay_var = tk.DoubleVar(
             value=float(self.config.get("multi_delay_seconds", DEFAULT_CONFIG["multi_delay_seconds"]))
         )
 
-        self.log_queue: "queue.Queue[str]" = queue.Queue()
-        self._log_messages: List[str] = []
+        self.log_queue: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+        self._ui_thread_id = threading.get_ident()
+        self._log_flush_scheduled = False
+        self._config_dirty = False
+        self._config_flush_scheduled = False
+        self._config_writer: Optional[threading.Thread] = None
         self._busy_workers = 0
+        self._control_update_depth = 0
+        self._control_update_pending = False
         self._batch_running = False
-        self._cancel_batch = False
+        self._cancel_event = threading.Event()
 
         self._single_worker: Optional[threading.Thread] = None
-        self._batch_worker: Optional[threading.Thread] = None
-        self._refresh_thread: Optional[threading.Thread] = None
+        self._refresh_pending = False
         self._log_handler: Optional[GuiLogHandler] = None
 
+        self._batch_data: List[Dict[str, str]] = []
         self.batch_rows: List[BatchRow] = []
-        self.batch_canvas: Optional[tk.Canvas] = None
+        self._batch_offset = 0
+        self._batch_capacity = 1
+        self._batch_row_height = 0
+        self._viewport_height = 0
+        self._viewport_resize_id: Optional[str] = None
         self.batch_items_frame: Optional[ttk.Frame] = None
-        self.batch_items_window: Optional[int] = None
         self.batch_scrollbar: Optional[ttk.Scrollbar] = None
 
         self.add_row_button: Optional[ttk.Button] = None
@@ -183,16 +236,13 @@ class GeminiTTSApp:
         self.toolbar_settings_btn: Optional[ttk.Button] = None
         self.toolbar_refresh_btn: Optional[ttk.Button] = None
 
-        self._build_ui()
-        self._setup_logging()
+    def _finish_boot(self) -> None:
+        """窗口首次绘制后再填充音色、默认文本并启动后台刷新。"""
         self._populate_voice_options()
         self._load_default_text()
-        self._ensure_initial_batch_rows()
         self._set_status(self._status_message_from_config())
         self._refresh_voice_list_async()
 
-        self.root.after(200, self._flush_log_queue)
-        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
     def _build_ui(self) -> None:
         """创建主界面布局。"""
         self._build_toolbar()
@@ -297,19 +347,14 @@ class GeminiTTSApp:
         scroll_area.columnconfigure(0, weight=1)
         scroll_area.rowconfigure(0, weight=1)
 
-        self.batch_canvas = tk.Canvas(scroll_area, highlightthickness=0)
-        self.batch_canvas.grid(row=0, column=0, sticky=tk.NSEW)
-        self.batch_scrollbar = ttk.Scrollbar(scroll_area, orient=tk.VERTICAL, command=self.batch_canvas.yview)
+        self.batch_items_frame = ttk.Frame(scroll_area, height=BATCH_VIEWPORT_HEIGHT)
+        self.batch_items_frame.grid(row=0, column=0, sticky=tk.NSEW)
+        self.batch_items_frame.pack_propagate(False)
+        self.batch_scrollbar = ttk.Scrollbar(scroll_area, orient=tk.VERTICAL, command=self._on_batch_scroll)
         self.batch_scrollbar.grid(row=0, column=1, sticky=tk.NS)
-        self.batch_canvas.configure(yscrollcommand=self.batch_scrollbar.set)
-
-        self.batch_items_frame = ttk.Frame(self.batch_canvas)
-        self.batch_items_window = self.batch_canvas.create_window((0, 0), window=self.batch_items_frame, anchor="nw")
 
-        self.batch_items_frame.bind(
-            "<Configure>", lambda _: self.batch_canvas.configure(scrollregion=self.batch_canvas.bbox("all"))
-        )
-        self.batch_canvas.bind("<Configure>", self._on_batch_canvas_configure)
+        self.batch_items_frame.bind("<Configure>", self._on_batch_viewport_configure)
+        self._bind_batch_wheel(self.batch_items_frame)
 
         delay_row = ttk.Frame(frame)
         delay_row.grid(row=3, column=0, sticky=tk.W, pady=(8, 0))
@@ -336,8 +381,32 @@ class GeminiTTSApp:
         """创建日志展示区域。"""
         frame = ttk.LabelFrame(self.root, text="日志")
         frame.pack(fill=tk.BOTH, expand=False, padx=12, pady=(0, 12))
-        self.log_text = ScrolledText(frame, height=LOG_TEXT_HEIGHT, wrap=tk.WORD, state=tk.DISABLED)
-        self.log_text.pack(fill=tk.BOTH, expand=True)
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(0, weight=1)
+        y_scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL)
+        x_scrollbar = ttk.Scrollbar(frame, orient=tk.HORIZONTAL)
+        self.log_list = tk.Listbox(
+            frame,
+            height=LOG_TEXT_HEIGHT,
+            activestyle="none",
+            selectmode=tk.EXTENDED,
+            yscrollcommand=y_scrollbar.set,
+            xscrollcommand=x_scrollbar.set,
+        )
+        self.log_list.grid(row=0, column=0, sticky=tk.NSEW)
+        y_scrollbar.grid(row=0, column=1, sticky=tk.NS)
+        x_scrollbar.grid(row=1, column=0, sticky=tk.EW)
+        y_scrollbar.configure(command=self.log_list.yview)
+        x_scrollbar.configure(command=self.log_list.xview)
+        self.log_list.bind("<<Copy>>", self._copy_log_selection)
+
+    def _copy_log_selection(self, event: tk.Event) -> str:  # pragma: no cover - UI 回调
+        """将选中的日志行复制到剪贴板。"""
+        lines = [self.log_list.get(index) for index in self.log_list.curselection()]
+        if lines:
+            self.root.clipboard_clear()
+            self.root.clipboard_append("\n".join(lines))
+        return "break"
 
     def _build_status_bar(self) -> None:
         """放置底部状态栏。"""
@@ -353,30 +422,42 @@ class GeminiTTSApp:
         self._log_handler = handler
 
     def queue_log_message(self, message: str) -> None:
-        """推送日志消息到界面队列。"""
+        """推送日志消息到界面队列；后台线程只入队，不触碰 Tk。"""
         self.log_queue.put(message)
+        # GuiLogHandler.emit 持有日志锁时调用此处，跨线程调用 root.after 可能与界面线程互相等待。
+        if threading.get_ident() == self._ui_thread_id:
+            self._arm_log_drain()
+
+    def _arm_log_drain(self) -> None:
+        """在界面线程中启动日志刷新定时器；后台任务运行期间由刷新逻辑自行续期。"""
+        if self._log_flush_scheduled:
+            return
+        self._log_flush_scheduled = True
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_log_queue)
 
     def _flush_log_queue(self) -> None:
         """刷新界面日志内容。"""
-        updated = False
-        while True:
-            try:
-                message = self.log_queue.get_nowait()
-            except queue.Empty:
-                break
-            self._log_messages.append(message)
-            updated = True
-
-        if updated:
-            if len(self._log_messages) > MAX_LOG_LINES:
-                self._log_messages = self._log_messages[-MAX_LOG_LINES:]
-            self.log_text.configure(state=tk.NORMAL)
-            self.log_text.delete("1.0", tk.END)
-            self.log_text.insert(tk.END, "\n".join(self._log_messages) + "\n")
-            self.log_text.configure(state=tk.DISABLED)
-            self.log_text.see(tk.END)
-
-        self.root.after(200, self._flush_log_queue)
+        self._log_flush_scheduled = False
+        # 界面线程是唯一的消费者，qsize() 统计到的消息一定可以取出，无需捕获 queue.Empty。
+        get = self.log_queue.get_nowait
+        new_messages = [get() for _ in range(min(LOG_FLUSH_BATCH, self.log_queue.qsize()))]
+
+        if new_messages:
+            # Listbox 条目不能换行，多行消息（如异常堆栈）拆成多条插入。
+            self.log_list.insert(tk.END, *"\n".join(new_messages).split("\n"))
+            overflow = self.log_list.size() - MAX_LOG_LINES
+            if overflow > 0:
+                self.log_list.delete(0, overflow - 1)
+            self.log_list.see(tk.END)
+
+        writer = self._config_writer
+        if (
+            self._busy_workers
+            or self._refresh_pending
+            or (writer is not None and writer.is_alive())
+            or not self.log_queue.empty()
+        ):
+            self._arm_log_drain()
 
     def _set_status(self, message: str) -> None:
         """更新状态栏文字。"""
@@ -384,9 +465,7 @@ class GeminiTTSApp:
 
     def _status_message_from_config(self) -> str:
         """根据配置生成状态提示。"""
-        default_voice = self.config.get("default_voice", DEFAULT_CONFIG["default_voice"])
-        default_output = self.config.get("default_output", DEFAULT_CONFIG["default_output"])
-        return f"默认音色: {default_voice} | 默认输出: {default_output}"
+        return f"默认音色: {self._default_voice} | 默认输出: {self._default_output}"
 
     def _schedule(self, callback, *args) -> None:
         """将回调调度回 Tk 事件循环。"""
@@ -396,10 +475,29 @@ class GeminiTTSApp:
         """在线程中安全更新状态栏。"""
         self._schedule(self._set_status, message)
 
+    def _rebuild_voice_indices(self) -> None:
+        """根据 self.voices 重建标签映射、反向索引与排序后的标签。"""
+        voice_map: Dict[str, str] = {}
+        for item in self.voices:
+            voice_id = item.get("id", "")
+            label = item.get("label") or voice_id
+            if not label:
+                continue
+            if label in voice_map:
+                label = f"{label} ({voice_id})"
+            voice_map[label] = voice_id
+
+        id_to_label: Dict[str, str] = {}
+        for label, voice_id in voice_map.items():
+            id_to_label.setdefault(voice_id, label)
+
+        self.voice_map = voice_map
+        self._voice_id_to_label = id_to_label
+        self._sorted_labels = sorted(voice_map)
+
     def _populate_voice_options(self) -> None:
         """刷新音色下拉框。"""
-        labels = list(self.voice_map.keys())
-        labels.sort()
+        labels = self._sorted_labels
         self.voice_combo["values"] = labels
 
         target_id = self.manual_voice_var.get() or self.config.get("default_voice", "")
@@ -415,22 +513,35 @@ class GeminiTTSApp:
         """根据音色 ID 定位下拉显示文本。"""
         if not voice_id:
             return None
-        for label, mapped_id in self.voice_map.items():
-            if mapped_id == voice_id:
-                return label
-        return None
+        return self._voice_id_to_label.get(voice_id)
 
     def _load_default_text(self) -> None:
-        """尝试加载配置中的默认文本文件。"""
-        path = Path(self.config.get("input_text_path", DEFAULT_CONFIG["input_text_path"]))
-        if not path.exists():
-            return
+        """在后台读取配置中的默认文本文件。"""
+        path = Path(self._input_text_path)
+
+        def worker() -> None:
+            if not path.exists():
+                return
+            try:
+                content = path.read_text(encoding="utf-8")
+            except OSError as exc:
+                self._schedule(self.queue_log_message, f"无法读取默认文本: {exc}")
+                return
+            if content.strip():
+                self._schedule(self._install_default_text, content)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _install_default_text(self, content: str) -> None:
+        """写入默认文本；用户已开始输入时保留其内容。"""
+        if self.single_text.compare("end-1c", "==", "1.0"):
+            self._set_single_text(content)
+
+    def _set_single_text(self, content: str) -> None:
+        """用一次替换写入单次模式文本框，旧版 Tk 回退为删除加插入。"""
         try:
-            content = path.read_text(encoding="utf-8")
-        except OSError as exc:
-            self.queue_log_message(f"无法读取默认文本: {exc}")
-            return
-        if content.strip():
+            self.single_text.replace("1.0", tk.END, content)
+        except tk.TclError:
             self.single_text.delete("1.0", tk.END)
             self.single_text.insert(tk.END, content)
 
@@ -442,10 +553,13 @@ class GeminiTTSApp:
         label = self.voice_var.get()
         if label:
             return self.voice_map.get(label, "")
-        return self.config.get("default_voice", DEFAULT_CONFIG["default_voice"])
+        return self._default_voice
 
     def _update_controls_state(self) -> None:
         """根据任务状态统一开关所有按钮。"""
+        if self._control_update_depth:
+            self._control_update_pending = True
+            return
         if self._batch_running:
             self.single_generate_btn.config(state=tk.DISABLED)
             self.batch_generate_btn.config(state=tk.DISABLED)
@@ -468,13 +582,26 @@ class GeminiTTSApp:
         if self.batch_import_btn:
             self.batch_import_btn.config(state=disabled)
         if self.batch_export_btn:
-            export_state = disabled if self.batch_rows else tk.DISABLED
+            export_state = disabled if self._batch_data else tk.DISABLED
             self.batch_export_btn.config(state=export_state)
         self._update_batch_indices()
 
+    @contextlib.contextmanager
+    def _suspend_control_updates(self) -> Iterator[None]:
+        """批量修改期间暂停按钮状态刷新，结束后统一刷新一次。"""
+        self._control_update_depth += 1
+        try:
+            yield
+        finally:
+            self._control_update_depth -= 1
+            if not self._control_update_depth and self._control_update_pending:
+                self._control_update_pending = False
+                self._update_controls_state()
+
     def _enter_busy(self) -> None:
         """标记当前存在后台任务。"""
         self._busy_workers += 1
+        self._arm_log_drain()
         self._update_controls_state()
 
     def _leave_busy(self) -> None:
@@ -491,15 +618,12 @@ class GeminiTTSApp:
     def _browse_output_path(self) -> None:
         """选择单次合成的输出路径。"""
         current = Path(self.output_path_var.get() or DEFAULT_CONFIG["default_output"])
-        try:
-            initial_dir = current.resolve().parent
-        except Exception:
-            initial_dir = Path.cwd()
+        initial_dir = _resolve_parent_dir(str(current))
         selected = filedialog.asksaveasfilename(
             title="选择输出文件",
             defaultextension=".wav",
             filetypes=[("WAV", "*.wav"), ("All Files", "*.*")],
-            initialdir=str(initial_dir),
+            initialdir=initial_dir,
             initialfile=current.name,
         )
         if selected:
@@ -507,15 +631,11 @@ class GeminiTTSApp:
 
     def _on_load_text(self) -> None:
         """从磁盘加载文本内容。"""
-        initial = Path(self.config.get("input_text_path", DEFAULT_CONFIG["input_text_path"]))
-        try:
-            initial_dir = initial.resolve().parent
-        except Exception:
-            initial_dir = Path.cwd()
+        initial_dir = _resolve_parent_dir(self._input_text_path)
         filename = filedialog.askopenfilename(
             title="选择文本文件",
             filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")],
-            initialdir=str(initial_dir),
+            initialdir=initial_dir,
         )
         if not filename:
             return
@@ -524,24 +644,20 @@ class GeminiTTSApp:
         except OSError as exc:
             messagebox.showerror("加载失败", f"无法读取文件: {exc}")
             return
-        self.single_text.delete("1.0", tk.END)
-        self.single_text.insert(tk.END, content)
+        self._set_single_text(content)
         self.config["input_text_path"] = filename
-        save_config(self.config)
+        self._mark_config_dirty()
         self.queue_log_message(f"已加载文本文件: {filename}")
 
     def _on_save_text(self) -> None:
         """将当前文本编辑内容保存到本地。"""
-        current = Path(self.config.get("input_text_path", DEFAULT_CONFIG["input_text_path"]))
-        try:
-            initial_dir = current.resolve().parent
-        except Exception:
-            initial_dir = Path.cwd()
+        current = Path(self._input_text_path)
+        initial_dir = _resolve_parent_dir(str(current))
         selected = filedialog.asksaveasfilename(
             title="保存文本文件",
             defaultextension=".txt",
             filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")],
-            initialdir=str(initial_dir),
+            initialdir=initial_dir,
             initialfile=current.name,
         )
         if not selected:
@@ -553,7 +669,7 @@ class GeminiTTSApp:
             messagebox.showerror("保存失败", f"无法写入文件: {exc}")
             return
         self.config["input_text_path"] = selected
-        save_config(self.config)
+        self._mark_config_dirty()
         self.queue_log_message(f"已保存文本到 {selected}")
     def _on_single_generate(self) -> None:
         """触发单次语音生成。"""
@@ -571,16 +687,14 @@ class GeminiTTSApp:
             messagebox.showwarning("缺少音色", "请选择或输入音色 ID。")
             return
 
-        output_path = self.output_path_var.get().strip() or self.config.get(
-            "default_output", DEFAULT_CONFIG["default_output"]
-        )
+        output_path = self.output_path_var.get().strip() or self._default_output
         if not output_path:
             messagebox.showwarning("缺少输出", "请提供 WAV 保存路径。")
             return
 
         self.config["default_voice"] = voice_id
         self.config["default_output"] = output_path
-        save_config(self.config)
+        self._mark_config_dirty()
 
         self._set_status("正在生成声音...")
         self._enter_busy()
@@ -606,25 +720,34 @@ class GeminiTTSApp:
 
     def _ensure_initial_batch_rows(self) -> None:
         """确保批量面板至少提供默认条目。"""
-        if self.batch_rows:
+        if self._batch_data:
             return
-        for _ in range(DEFAULT_BATCH_ROWS):
-            self._add_batch_row()
-        self._update_controls_state()
+        with self._suspend_control_updates():
+            for _ in range(DEFAULT_BATCH_ROWS):
+                self._add_batch_row()
 
     def _clear_batch_rows(self) -> None:
-        """移除所有批量条目控件。"""
-        for row in self.batch_rows:
-            row.frame.destroy()
-        self.batch_rows.clear()
+        """清空所有批量条目数据。"""
+        self._batch_data.clear()
+        self._batch_offset = 0
+        self._refresh_batch_viewport()
 
     def _add_batch_row(self, text: str = "", voice: Optional[str] = None, output: str = "") -> None:
         """新增一条批量任务。"""
-        if self.batch_items_frame is None:
-            return
+        self._sync_visible_batch_rows()
+        self._batch_data.append(
+            {
+                "text": text,
+                "voice": voice if voice is not None else self.manual_voice_var.get(),
+                "output": output,
+            }
+        )
+        self._refresh_batch_viewport()
+        self._update_controls_state()
 
+    def _create_batch_row(self) -> BatchRow:
+        """创建一组可复用的条目控件。"""
         row_frame = ttk.Frame(self.batch_items_frame, padding=8, relief=tk.GROOVE)
-        row_frame.pack(fill=tk.X, expand=True, pady=(0, 8))
         row_frame.columnconfigure(1, weight=1)
 
         header = ttk.Frame(row_frame)
@@ -640,15 +763,13 @@ class GeminiTTSApp:
         text_widget = tk.Text(row_frame, height=BATCH_ROW_TEXT_HEIGHT, wrap=tk.WORD)
         text_widget.grid(row=1, column=0, columnspan=3, sticky=tk.NSEW, pady=(6, 6))
         row_frame.rowconfigure(1, weight=1)
-        if text:
-            text_widget.insert(tk.END, text)
 
-        voice_var = tk.StringVar(value=voice if voice is not None else self.manual_voice_var.get())
+        voice_var = tk.StringVar()
         ttk.Label(row_frame, text="音色 ID").grid(row=2, column=0, sticky=tk.W)
         voice_entry = ttk.Entry(row_frame, textvariable=voice_var)
         voice_entry.grid(row=2, column=1, columnspan=2, sticky=tk.EW, padx=(8, 0))
 
-        output_var = tk.StringVar(value=output)
+        output_var = tk.StringVar()
         ttk.Label(row_frame, text="输出路径").grid(row=3, column=0, sticky=tk.W, pady=(6, 0))
         output_entry = ttk.Entry(row_frame, textvariable=output_var)
         output_entry.grid(row=3, column=1, sticky=tk.EW, padx=(8, 0), pady=(6, 0))
@@ -669,28 +790,143 @@ class GeminiTTSApp:
 
         browse_button.configure(command=lambda: self._browse_row_output(row))
         remove_button.configure(command=lambda: self._remove_batch_row(row))
+        text_widget.bind("<<Modified>>", lambda _event: self._on_batch_text_modified(row))
+        self._bind_batch_wheel(row_frame, skip=(text_widget,))
+
+        if not self._batch_row_height:
+            row_frame.update_idletasks()
+            self._batch_row_height = row_frame.winfo_reqheight() + BATCH_ROW_SPACING
+        return row
+
+    def _load_batch_row(self, row: BatchRow, data_index: int) -> None:
+        """把指定数据写入复用控件。"""
+        entry = self._batch_data[data_index]
+        row.data_index = data_index
+        row.text_widget.delete("1.0", tk.END)
+        row.text_widget.insert("1.0", entry["text"])
+        row.text_widget.edit_modified(False)
+        row.text_dirty = False
+        row.voice_var.set(entry["voice"])
+        row.output_var.set(entry["output"])
+
+    def _on_batch_text_modified(self, row: BatchRow) -> None:  # pragma: no cover - UI 回调
+        """记录条目文本被编辑，并复位 Tk 的修改标记以便再次触发。"""
+        if row.text_widget.edit_modified():
+            row.text_dirty = True
+            row.text_widget.edit_modified(False)
+
+    def _sync_visible_batch_rows(self) -> None:
+        """将可见控件中的编辑内容写回批量数据，未编辑的文本不再读取。"""
+        for row in self.batch_rows:
+            if 0 <= row.data_index < len(self._batch_data):
+                entry = self._batch_data[row.data_index]
+                # <<Modified>> 排在事件队列末尾，回调可能尚未执行，因此同时检查 Tk 的修改标记。
+                if row.text_dirty or row.text_widget.edit_modified():
+                    entry["text"] = row.text_widget.get("1.0", "end-1c")
+                    row.text_dirty = False
+                    row.text_widget.edit_modified(False)
+                entry["voice"] = row.voice_var.get()
+                entry["output"] = row.output_var.get()
+
+    def _refresh_batch_viewport(self, *, reload: bool = False) -> None:
+        """按当前偏移量把批量数据绑定到复用控件上；reload 为 False 时跳过仍绑定同一条数据的控件。"""
+        if self.batch_items_frame is None:
+            return
+        total = len(self._batch_data)
+        self._batch_offset = max(0, min(self._batch_offset, total - self._batch_capacity))
+        visible = min(self._batch_capacity, total - self._batch_offset)
+
+        while len(self.batch_rows) < visible:
+            self.batch_rows.append(self._create_batch_row())
+
+        for position, row in enumerate(self.batch_rows):
+            if position < visible:
+                data_index = self._batch_offset + position
+                if row.data_index < 0:
+                    row.frame.pack(fill=tk.X, pady=(0, BATCH_ROW_SPACING))
+                # 重新写入会重置光标、选区与撤销记录，数据未换位的条目刚同步过，无需重载。
+                if reload or row.data_index != data_index:
+                    self._load_batch_row(row, data_index)
+            elif row.data_index >= 0:
+                row.data_index = -1
+                row.frame.pack_forget()
+
+        if self.batch_scrollbar is not None:
+            if total:
+                self.batch_scrollbar.set(self._batch_offset / total, (self._batch_offset + visible) / total)
+            else:
+                self.batch_scrollbar.set(0.0, 1.0)
+        self._update_batch_indices()
 
-        self.batch_rows.append(row)
-        self._update_controls_state()
+    def _scroll_batch_to(self, offset: int) -> None:
+        """滚动批量视口到指定的首条数据。"""
+        self._sync_visible_batch_rows()
+        self._batch_offset = offset
+        self._refresh_batch_viewport()
+
+    def _on_batch_scroll(self, action: str, value: str, unit: Optional[str] = None) -> None:  # pragma: no cover - UI 回调
+        """响应批量滚动条拖动与点击。"""
+        if action == tk.MOVETO:
+            offset = int(round(float(value) * len(self._batch_data)))
+        else:
+            step = int(value)
+            if unit == tk.PAGES:
+                step *= self._batch_capacity
+            offset = self._batch_offset + step
+        self._scroll_batch_to(offset)
+
+    def _on_batch_wheel(self, event: tk.Event) -> str:  # pragma: no cover - UI 回调
+        """用鼠标滚轮逐条滚动批量视口。"""
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            step = -1
+        else:
+            step = 1
+        self._scroll_batch_to(self._batch_offset + step)
+        return "break"
+
+    def _bind_batch_wheel(self, widget: tk.Misc, skip: Tuple[tk.Misc, ...] = ()) -> None:
+        """为控件及其子控件绑定批量视口的滚轮事件。"""
+        if widget in skip:
+            return
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self._on_batch_wheel)
+        for child in widget.winfo_children():
+            self._bind_batch_wheel(child, skip)
+
+    def _on_batch_viewport_configure(self, event: tk.Event) -> None:  # pragma: no cover - UI 回调
+        """记录视口高度，拖动缩放期间合并为一次重排。"""
+        if event.height == self._viewport_height:
+            return
+        self._viewport_height = event.height
+        if self._viewport_resize_id is None:
+            self._viewport_resize_id = self.root.after(BATCH_RESIZE_THROTTLE_MS, self._apply_viewport_height)
+
+    def _apply_viewport_height(self) -> None:
+        """按最新的视口高度重新计算可容纳的条目数量。"""
+        self._viewport_resize_id = None
+        row_height = self._batch_row_height or 1
+        capacity = max(1, min(BATCH_POOL_SIZE, self._viewport_height // row_height))
+        if capacity == self._batch_capacity:
+            return
+        self._sync_visible_batch_rows()
+        self._batch_capacity = capacity
+        self._refresh_batch_viewport()
 
     def _on_add_batch_row(self) -> None:
         """批量面板中点击新增时的处理。"""
         self._add_batch_row()
+        self._scroll_batch_to(len(self._batch_data))
 
     def _browse_row_output(self, row: BatchRow) -> None:
         """为批量条目指定输出位置。"""
         current_text = row.output_var.get().strip() or self.output_path_var.get().strip()
-        fallback = self.config.get("default_output", DEFAULT_CONFIG["default_output"])
-        current = Path(current_text or fallback)
-        try:
-            initial_dir = current.resolve().parent
-        except Exception:
-            initial_dir = Path.cwd()
+        current = Path(current_text or self._default_output)
+        initial_dir = _resolve_parent_dir(str(current))
         selected = filedialog.asksaveasfilename(
             title="选择输出文件",
             defaultextension=".wav",
             filetypes=[("WAV", "*.wav"), ("All Files", "*.*")],
-            initialdir=str(initial_dir),
+            initialdir=initial_dir,
             initialfile=current.name,
         )
         if selected:
@@ -701,27 +937,39 @@ class GeminiTTSApp:
         if self._batch_running or self._busy_workers:
             messagebox.showinfo("提示", "任务执行过程中无法删除条目。")
             return
-        if len(self.batch_rows) <= 1:
+        if len(self._batch_data) <= 1:
             messagebox.showinfo("提示", "至少需要保留一个批量条目。")
             return
-        target.frame.destroy()
-        self.batch_rows = [row for row in self.batch_rows if row is not target]
+        if target.data_index < 0:
+            return
+        self._sync_visible_batch_rows()
+        del self._batch_data[target.data_index]
+        self._refresh_batch_viewport(reload=True)
         self._update_controls_state()
 
     def _update_batch_indices(self) -> None:
         """刷新批量条目的编号与删除按钮状态。"""
-        disable_removal = len(self.batch_rows) <= 1 or self._batch_running or self._busy_workers
-        for idx, row in enumerate(self.batch_rows, start=1):
-            row.index_label.config(text=f"条目 {idx}")
-            row.remove_button.config(state=tk.DISABLED if disable_removal else tk.NORMAL)
+        disable_removal = len(self._batch_data) <= 1 or self._batch_running or self._busy_workers
+        remove_state = tk.DISABLED if disable_removal else tk.NORMAL
+        for row in self.batch_rows:
+            if row.data_index < 0:
+                continue
+            index = row.data_index + 1
+            if row.last_index != index:
+                row.index_label.config(text=f"条目 {index}")
+                row.last_index = index
+            if row.last_remove_state != remove_state:
+                row.remove_button.config(state=remove_state)
+                row.last_remove_state = remove_state
 
     def _collect_batch_rows(self, *, include_empty: bool = False) -> List[Tuple[str, str, str]]:
         """收集批量条目的当前值。"""
+        self._sync_visible_batch_rows()
         entries: List[Tuple[str, str, str]] = []
-        for row in self.batch_rows:
-            text = row.text_widget.get("1.0", tk.END).strip()
-            voice = row.voice_var.get().strip()
-            output = row.output_var.get().strip()
+        for entry in self._batch_data:
+            text = entry["text"].strip()
+            voice = entry["voice"].strip()
+            output = entry["output"].strip()
             if text or voice or output or include_empty:
                 entries.append((text, voice, output))
         return entries
@@ -729,16 +977,7 @@ class GeminiTTSApp:
     def _on_import_batch_tasks(self) -> None:
         """从文件导入批量配置。"""
         stored = self.config.get("batch_tasks_path", "")
-        if stored:
-            try:
-                initial_dir = str(Path(stored).resolve().parent)
-            except Exception:
-                initial_dir = str(Path.cwd())
-        else:
-            try:
-                initial_dir = str(Path(self.config.get("default_output", DEFAULT_CONFIG["default_output"])).resolve().parent)
-            except Exception:
-                initial_dir = str(Path.cwd())
+        initial_dir = _resolve_parent_dir(stored or self._default_output)
         filename = filedialog.askopenfilename(
             title="导入批量条目",
             filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")],
@@ -747,31 +986,19 @@ class GeminiTTSApp:
         if not filename:
             return
         try:
-            content = Path(filename).read_text(encoding="utf-8")
+            tasks = list(_iter_task_rows(filename))
         except OSError as exc:
             messagebox.showerror("导入失败", f"无法读取文件: {exc}")
             return
 
-        tasks: List[Tuple[str, str, str]] = []
-        for raw_line in content.splitlines():
-            stripped = raw_line.strip()
-            if not stripped or stripped.startswith("#"):
-                continue
-            parts = [_unescape_field(part).strip() for part in _split_escaped_line(stripped)]
-            text = parts[0] if parts else ""
-            voice = parts[1] if len(parts) > 1 else ""
-            output = parts[2] if len(parts) > 2 else ""
-            if not text and not voice and not output:
-                continue
-            tasks.append((text, voice, output))
-
-        self._clear_batch_rows()
-        if tasks:
-            for text, voice, output in tasks:
-                self._add_batch_row(text=text, voice=voice, output=output)
-        self._ensure_initial_batch_rows()
+        with self._suspend_control_updates():
+            self._clear_batch_rows()
+            self._batch_data.extend({"text": text, "voice": voice, "output": output} for text, voice, output in tasks)
+            self._ensure_initial_batch_rows()
+            self._refresh_batch_viewport()
+            self._update_controls_state()
         self.config["batch_tasks_path"] = filename
-        save_config(self.config)
+        self._mark_config_dirty()
         self.queue_log_message(f"已导入批量条目: {filename}")
 
     def _on_export_batch_tasks(self) -> None:
@@ -782,20 +1009,8 @@ class GeminiTTSApp:
             return
 
         stored = self.config.get("batch_tasks_path", "")
-        if stored:
-            try:
-                initial_dir = str(Path(stored).resolve().parent)
-                initial_file = Path(stored).name
-            except Exception:
-                initial_dir = str(Path.cwd())
-                initial_file = "batch_tasks.txt"
-        else:
-            try:
-                default_output = Path(self.config.get("default_output", DEFAULT_CONFIG["default_output"]))
-                initial_dir = str(default_output.resolve().parent)
-            except Exception:
-                initial_dir = str(Path.cwd())
-            initial_file = "batch_tasks.txt"
+        initial_dir = _resolve_parent_dir(stored or self._default_output)
+        initial_file = Path(stored).name if stored else "batch_tasks.txt"
 
         selected = filedialog.asksaveasfilename(
             title="导出批量条目",
@@ -807,62 +1022,55 @@ class GeminiTTSApp:
         if not selected:
             return
 
-        lines: List[str] = []
-        for text, voice, output in entries:
-            parts = [_escape_field(text)]
-            if voice:
-                parts.append(_escape_field(voice))
-            if output:
-                parts.append(_escape_field(output))
-            lines.append(" | ".join(parts))
-
         try:
-            Path(selected).write_text("\n".join(lines) + "\n", encoding="utf-8")
+            with open(selected, "w", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE) as handle:
+                handle.writelines(_format_task_row(*entry) for entry in entries)
         except OSError as exc:
             messagebox.showerror("导出失败", f"无法写入文件: {exc}")
             return
 
         self.config["batch_tasks_path"] = selected
-        save_config(self.config)
+        self._mark_config_dirty()
         self.queue_log_message(f"批量条目已导出至 {selected}")
-    def _on_batch_canvas_configure(self, event: tk.Event) -> None:  # pragma: no cover - UI 回调
-        """在画布尺寸变化时同步内部容器宽度。"""
-        if self.batch_canvas and self.batch_items_window is not None:
-            self.batch_canvas.itemconfigure(self.batch_items_window, width=event.width)
 
     def _parse_batch_entries(self) -> List[Tuple[str, str, str]]:
         """将批量设置转换为可执行的任务列表。"""
         entries: List[Tuple[str, str, str]] = []
 
-        base_path = Path(self.config.get("default_output", DEFAULT_CONFIG["default_output"]))
+        base_path = Path(self._default_output)
         stem = base_path.stem or "output"
         suffix = base_path.suffix or ".wav"
-
-        for display_index, row in enumerate(self.batch_rows, start=1):
-            text = row.text_widget.get("1.0", tk.END).strip()
-            voice_id = row.voice_var.get().strip()
-            output_path = row.output_var.get().strip()
-
+        # 与 base_path.with_name(...) 结果一致的目录前缀，避免逐条构造 Path。
+        prefix = str((base_path.parent if base_path.name else base_path) / "_")[:-1]
+        format_name = BATCH_FILENAME_TEMPLATE.format
+        fallback_voice: Optional[str] = None
+        append = entries.append
+
+        self._sync_visible_batch_rows()
+        for display_index, entry in enumerate(self._batch_data, start=1):
+            text = entry["text"].strip()
             if not text:
                 continue
 
+            voice_id = entry["voice"].strip()
             if not voice_id:
-                voice_id = self._get_selected_voice_id()
+                if fallback_voice is None:
+                    fallback_voice = self._get_selected_voice_id()
+                voice_id = fallback_voice
             if not voice_id:
                 raise ValueError(f"条目 {display_index} 缺少音色 ID。")
 
-            entry_index = len(entries) + 1
+            output_path = entry["output"].strip()
             if not output_path:
-                generated = BATCH_FILENAME_TEMPLATE.format(stem=stem, index=entry_index, suffix=suffix)
-                output_path = str(base_path.with_name(generated))
+                output_path = prefix + format_name(stem=stem, index=len(entries) + 1, suffix=suffix)
 
-            entries.append((text, voice_id, output_path))
+            append((text, voice_id, output_path))
 
         return entries
 
     def _on_batch_generate(self) -> None:
         """触发批量任务执行。"""
-        if self._batch_worker and self._batch_worker.is_alive():
+        if self._batch_running:
             messagebox.showinfo("正在处理", "批量任务已处于执行状态。")
             return
 
@@ -884,10 +1092,10 @@ class GeminiTTSApp:
 
         self.multi_delay_var.set(delay)
         self.config["multi_delay_seconds"] = delay
-        save_config(self.config)
+        self._mark_config_dirty()
 
         self._batch_running = True
-        self._cancel_batch = False
+        self._cancel_event.clear()
         self._enter_busy()
         self._set_status("正在处理批量任务...")
         self._update_controls_state()
@@ -895,46 +1103,50 @@ class GeminiTTSApp:
         total_count = len(entries)
         outcome = {"errors": 0, "cancelled": False, "total": total_count}
 
-        def worker() -> None:
-            for index, (text, voice_id, output_path) in enumerate(entries, start=1):
-                if self._cancel_batch:
-                    outcome["cancelled"] = True
-                    self.queue_log_message("批量任务已被用户取消。")
-                    break
-                try:
-                    gemini_tts(text, voice_id, output_path, config=self.config)
-                except Exception as exc:
-                    outcome["errors"] += 1
-                    self.queue_log_message(f"批量条目 {index} 失败: {exc}")
-                else:
-                    self.queue_log_message(f"批量条目 {index} -> {output_path}")
-                if self._cancel_batch:
-                    outcome["cancelled"] = True
-                    break
-                if delay and index < total_count:
-                    time.sleep(delay)
+        def report(position: int, error: Optional[Exception]) -> None:
+            if error is None:
+                self.queue_log_message(f"批量条目 {position + 1} -> {entries[position][2]}")
             else:
-                self._notify_status("批量任务已完成。")
+                self.queue_log_message(f"批量条目 {position + 1} 失败: {error}")
 
-            if outcome.get("cancelled"):
+        def worker() -> None:
+            # gemini_tts_batch 按 batch_parallelism 并发、按批量延迟间隔提交，并在停止后跳过排队中的条目。
+            try:
+                results = gemini_tts_batch(
+                    entries,
+                    config=self.config,
+                    cancel_event=self._cancel_event,
+                    on_result=report,
+                )
+            except Exception as exc:
+                self.queue_log_message(f"批量任务失败: {exc}")
+                results = [exc] * total_count
+            outcome["errors"] = sum(
+                1 for error in results if error is not None and not isinstance(error, CancelledError)
+            )
+
+            if self._cancel_event.is_set():
+                outcome["cancelled"] = True
+                self.queue_log_message("批量任务已被用户取消。")
                 self._notify_status("批量任务已取消。")
+            else:
+                self._notify_status("批量任务已完成。")
 
             self._schedule(lambda: self._finalize_batch(outcome))
 
-        self._batch_worker = threading.Thread(target=worker, daemon=True)
-        self._batch_worker.start()
+        threading.Thread(target=worker, daemon=True).start()
 
     def _on_cancel_batch(self) -> None:
         """请求终止批量任务。"""
         if not self._batch_running:
             return
-        self._cancel_batch = True
+        self._cancel_event.set()
         self._set_status("正在请求停止...")
 
     def _finish_batch(self) -> None:
         """批量任务收尾逻辑。"""
         self._batch_running = False
-        self._cancel_batch = False
+        self._cancel_event.clear()
         self._leave_busy()
 
     def _finalize_batch(self, outcome: Dict[str, Any]) -> None:
@@ -942,75 +1154,140 @@ class GeminiTTSApp:
         self._finish_batch()
         total = outcome.get("total", 0)
         if outcome.get("cancelled"):
-            messagebox.showinfo("批量任务", "批量任务已取消。")
+            self._notify_result("批量任务", "批量任务已取消。")
         elif outcome.get("errors"):
-            messagebox.showerror("批量任务", "批量任务完成，其中 {errors} / {total} 条失败。".format(errors=outcome["errors"], total=total))
+            self._notify_result(
+                "批量任务",
+                "批量任务完成，其中 {errors} / {total} 条失败。".format(errors=outcome["errors"], total=total),
+                level="error",
+            )
         else:
-            messagebox.showinfo("批量任务", "批量任务已完成。")
+            self._notify_result("批量任务", "批量任务已完成。")
+
+    def _notify_result(self, title: str, message: str, level: str = "info") -> None:
+        """提示任务结果；quiet_mode 开启时只更新状态栏与日志，不弹出模态对话框。"""
+        if self.config.get("quiet_mode", False):
+            self._set_status(message)
+            self.queue_log_message(f"{title}: {message}")
+        elif level == "error":
+            messagebox.showerror(title, message)
+        else:
+            messagebox.showinfo(title, message)
+
     def _refresh_voice_list_async(self, *, force_refresh: bool = False) -> None:
         """在后台刷新可用音色列表。"""
-        if self._refresh_thread and self._refresh_thread.is_alive():
+        if self._refresh_pending:
             self.queue_log_message("音色刷新任务已在进行，稍候即可。")
             return
 
         def worker() -> None:
             self._notify_status("正在刷新音色...")
+            voices: Optional[List[Dict[str, str]]] = None
             try:
                 voices = fetch_available_voices(self.config, force_refresh=force_refresh)
             except Exception as exc:
                 self.queue_log_message(f"刷新音色失败: {exc}")
             else:
-                self._schedule(self._update_voice_list, voices)
                 self.queue_log_message("音色列表已刷新。")
             finally:
-                self._notify_status(self._status_message_from_config())
-
-        self._refresh_thread = threading.Thread(target=worker, daemon=True)
-        self._refresh_thread.start()
+                self._schedule(self._apply_voices, voices, voices is not None)
+
+        self._refresh_pending = True
+        self._arm_log_drain()
+        if self.toolbar_refresh_btn:
+            self.toolbar_refresh_btn.config(state=tk.DISABLED)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _apply_voices(self, voices: Optional[List[Dict[str, str]]], refreshed: bool) -> None:
+        """在同一次事件循环中应用刷新结果并恢复状态栏与刷新按钮。"""
+        self._refresh_pending = False
+        if self.toolbar_refresh_btn:
+            self.toolbar_refresh_btn.config(state=tk.NORMAL)
+        if refreshed:
+            self._update_voice_list(voices)
+        self._set_status(self._status_message_from_config())
 
     def _update_voice_list(self, voices: Optional[List[Dict[str, str]]]) -> None:
-        """将最新音色写入 UI 和配置缓存。"""
+        """将最新音色写入 UI 和配置缓存；列表未变化时不重建也不写盘。"""
         voices = voices or DEFAULT_VOICES
-        voice_map: Dict[str, str] = {}
-        for item in voices:
-            voice_id = item.get("id", "")
-            label = item.get("label") or voice_id
-            if label in voice_map:
-                label = f"{label} ({voice_id})"
-            voice_map[label] = voice_id
-
+        if voices == self.voices and voices == self.config.get("voices"):
+            return
         self.voices = voices
-        self.voice_map = voice_map
+        self._rebuild_voice_indices()
         self._populate_voice_options()
 
-        self.config["voices"] = voices
-        save_config(self.config)
+        self.config["voices"] = self.voices
+        self._mark_config_dirty()
 
     def apply_settings(self, updates: Dict[str, object]) -> None:
         """应用设置对话框返回的变更。"""
         self.config.update(updates)
         self.config["version"] = __version__
-        save_config(self.config)
+        self._mark_config_dirty()
         configure_logging(self.config)
 
         self.manual_voice_var.set(str(self.config.get("default_voice", "")))
-        self.output_path_var.set(str(self.config.get("default_output", DEFAULT_CONFIG["default_output"])))
+        self.output_path_var.set(self._default_output)
         self.multi_delay_var.set(float(self.config.get("multi_delay_seconds", DEFAULT_CONFIG["multi_delay_seconds"])))
         self._populate_voice_options()
         self._set_status("设置已保存。")
 
 
+    def _sync_config_cache(self) -> None:
+        """把常用配置项缓存为实例属性。"""
+        config = self.config
+        self._default_output = str(config.get("default_output", DEFAULT_CONFIG["default_output"]))
+        self._default_voice = str(config.get("default_voice", DEFAULT_CONFIG["default_voice"]))
+        self._input_text_path = str(config.get("input_text_path", DEFAULT_CONFIG["input_text_path"]))
+
+    def _mark_config_dirty(self) -> None:
+        """同步配置缓存并标记配置已变更，合并短时间内的多次写入。"""
+        self._sync_config_cache()
+        self._config_dirty = True
+        if self._config_flush_scheduled:
+            return
+        self._config_flush_scheduled = True
+        self.root.after(CONFIG_FLUSH_DELAY_MS, self._flush_config)
+
+    def _flush_config(self, *, wait: bool = False) -> None:
+        """将待写入的配置交给后台线程保存；wait 为 True 时等待在途写入结束后在当前线程同步写入。"""
+        self._config_flush_scheduled = False
+        previous = self._config_writer
+        if wait and previous is not None:
+            # 先等在途的后台写入完成，避免旧快照覆盖关闭时的最终写入或在退出时留下临时文件。
+            previous.join()
+            self._config_writer = previous = None
+        if not self._config_dirty:
+            return
+        self._config_dirty = False
+        snapshot = dict(self.config)
+
+        def write() -> None:
+            if previous is not None:
+                previous.join()
+            save_config(snapshot)
+
+        if wait:
+            write()
+        else:
+            self._config_writer = threading.Thread(target=write, daemon=True)
+            self._config_writer.start()
+            # 写入失败的警告由后台线程入队，日志刷新需持续到写入结束才能显示出来。
+            self._arm_log_drain()
+
     def _open_settings_dialog(self) -> None:
         """弹出设置对话框。"""
         SettingsDialog(self.root, self)
 
     def _on_close(self) -> None:
         """窗口关闭时清理资源。"""
-        self._cancel_batch = True
+        self._cancel_event.set()
         if self._log_handler:
             logger = logging.getLogger("igtts")
             logger.removeHandler(self._log_handler)
             self._log_handler = None
+        self._flush_config(wait=True)
+        close_shared_sessions()
         self.root.destroy()
 
 class SettingsDialog:
@@ -1094,15 +1371,12 @@ class SettingsDialog:
     def _choose_output(self) -> None:
         """选择默认输出路径。"""
         current = Path(self.output_var.get() or DEFAULT_CONFIG["default_output"])
-        try:
-            initial_dir = current.resolve().parent
-        except Exception:
-            initial_dir = Path.cwd()
+        initial_dir = _resolve_parent_dir(str(current))
         selected = filedialog.asksaveasfilename(
             title="选择输出文件",
             defaultextension=".wav",
             filetypes=[("WAV", "*.wav"), ("All Files", "*.*")],
-            initialdir=str(initial_dir),
+            initialdir=initial_dir,
             initialfile=current.name,
         )
         if selected:
@@ -1111,15 +1385,12 @@ class SettingsDialog:
     def _choose_log_file(self) -> None:
         """选择日志输出位置。"""
         current = Path(self.log_file_var.get() or DEFAULT_CONFIG["log_file"])
-        try:
-            initial_dir = current.resolve().parent
-        except Exception:
-            initial_dir = Path.cwd()
+        initial_dir = _resolve_parent_dir(str(current))
         selected = filedialog.asksaveasfilename(
             title="选择日志文件",
             defaultextension=".log",
             filetypes=[("Log", "*.log"), ("Text", "*.txt"), ("All Files", "*.*")],
-            initialdir=str(initial_dir),
+            initialdir=initial_dir,
             initialfile=current.name,
         )
         if selected: